@@ -27,6 +27,10 @@ Running the script again re-reprojects from cache without re-downloading.
 Usage:
     pip install pillow numpy        # if not already installed
     python scripts/download_lp.py
+    python scripts/download_lp.py --fast   # quick deflate for iteration;
+                                           # run without --fast before committing
+    python scripts/download_lp.py --refresh  # revalidate cached source PNGs
+                                             # against the server (304 = keep)
 
 Leaflet ImageOverlay bounds per output file (sw_lat, sw_lon → ne_lat, ne_lon):
   world_low3.png    [[-65, -180], [75,  180]]   world overview (zoom 0–3)
@@ -38,10 +42,16 @@ Leaflet ImageOverlay bounds per output file (sw_lat, sw_lon → ne_lat, ne_lon):
   Australia.png     [[-48,   94], [ 8,  180]]
 """
 
+import email.utils
+import io
 import math
 import os
+import shutil
 import sys
+import tempfile
+import urllib.error
 import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
 import numpy as np
 from PIL import Image
@@ -110,34 +120,92 @@ FILES = [
 
 # ── Download ──────────────────────────────────────────────────────────────────
 
-def _download(url: str, dest: str) -> None:
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "Mozilla/5.0 (compatible; DarkHorizon/1.0)",
-            "Referer":    "https://djlorenz.github.io/astronomy/lp/",
-        },
-    )
-    with urllib.request.urlopen(req) as resp:
-        total      = int(resp.headers.get("Content-Length", 0))
-        downloaded = 0
-        block      = 1 << 16
+class _ProgressReader(io.RawIOBase):
+    """File-like wrapper that counts bytes read and draws a progress bar.
+
+    Wrapping the HTTP response lets shutil.copyfileobj run the actual copy
+    loop in C with 1 MiB blocks, while the bar is redrawn at most ~50 times
+    per download instead of once per 64 KiB chunk.
+    """
+
+    def __init__(self, raw, total: int):
+        self._raw        = raw
+        self._total      = total
+        self._downloaded = 0
+        self._reported   = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self._raw.readinto(b)
+        self._downloaded += n
+        if self._total and self._downloaded - self._reported > self._total / 50:
+            self._report()
+        return n
+
+    def _report(self) -> None:
+        self._reported = self._downloaded
+        pct = self._downloaded * 100 / self._total
+        bar = "#" * int(pct / 2)
+        sys.stdout.write(
+            f"\r    [{bar:<50}] {pct:5.1f}%  "
+            f"{self._downloaded / 1e6:5.1f} / {self._total / 1e6:.1f} MB"
+        )
+        sys.stdout.flush()
+
+    def finish(self) -> None:
+        if self._total:
+            self._report()
+        print()
+
+
+def _download(url: str, dest: str, quiet: bool = False) -> bool:
+    """Download url -> dest, revalidating instead when dest already exists.
+
+    An existing dest is offered to the server via If-Modified-Since (file
+    mtime) and If-None-Match (ETag remembered in a .etag sidecar); a 304
+    answer keeps the cached copy and skips the transfer entirely.  Returns
+    True when a new copy was written, False on 304.  quiet=True suppresses
+    the progress bar, which would interleave garbage when several downloads
+    run concurrently.
+    """
+    headers = {
+        "User-Agent": "Mozilla/5.0 (compatible; DarkHorizon/1.0)",
+        "Referer":    "https://djlorenz.github.io/astronomy/lp/",
+    }
+    etag_path = dest + ".etag"
+    if os.path.exists(dest):
+        headers["If-Modified-Since"] = email.utils.formatdate(
+            os.path.getmtime(dest), usegmt=True
+        )
+        if os.path.exists(etag_path):
+            with open(etag_path) as f:
+                headers["If-None-Match"] = f.read().strip()
+
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        resp = urllib.request.urlopen(req)
+    except urllib.error.HTTPError as err:
+        if err.code == 304:
+            return False
+        raise
+
+    with resp:
+        total  = int(resp.headers.get("Content-Length", 0))
+        etag   = resp.headers.get("ETag")
+        reader = _ProgressReader(resp, 0 if quiet else total)
         with open(dest, "wb") as f:
-            while True:
-                chunk = resp.read(block)
-                if not chunk:
-                    break
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total:
-                    pct = downloaded * 100 / total
-                    bar = "#" * int(pct / 2)
-                    sys.stdout.write(
-                        f"\r    [{bar:<50}] {pct:5.1f}%  "
-                        f"{downloaded / 1e6:5.1f} / {total / 1e6:.1f} MB"
-                    )
-                    sys.stdout.flush()
-    print()
+            shutil.copyfileobj(reader, f, length=1 << 20)
+    if not quiet:
+        reader.finish()
+
+    if etag:
+        with open(etag_path, "w") as f:
+            f.write(etag)
+    elif os.path.exists(etag_path):
+        os.remove(etag_path)
+    return True
 
 
 # ── Reprojection ──────────────────────────────────────────────────────────────
@@ -147,16 +215,94 @@ def _merc_y(lat_deg: float) -> float:
     return math.log(math.tan(math.pi / 4.0 + math.radians(lat_deg) / 2.0))
 
 
-def reproject(src_path: str, dst_path: str, lat_min: float, lat_max: float) -> None:
+def _compute_ysrc(out_h: int, src_h: int,
+                  lat_min: float, lat_max: float,
+                  merc_min: float, merc_max: float) -> np.ndarray:
+    """Source row index for each output row, without per-row transcendentals.
+
+    Source rows sample latitude linearly, so row k owns the latitude band
+    between edges k and k+1 of a uniform grid.  Converting those band edges
+    to Mercator Y once (src_h+1 log/tan calls total) lets a binary search
+    assign every output row directly — the arctan/exp Mercator inverse
+    drops out of the per-row path entirely, leaving the algebraically
+    identical integer lookup.
+
+    Indices are returned unclamped — the bottom edge lands exactly on
+    src_h — and the caller clamps the few distinct rows it actually gathers.
+    """
+    src_lat_edges  = np.linspace(lat_max, lat_min, src_h + 1)
+    src_merc_edges = np.log(np.tan(np.pi / 4.0 + np.radians(src_lat_edges) / 2.0))
+    out_merc       = np.linspace(merc_max, merc_min, out_h)
+
+    # Both sequences descend; negate so searchsorted sees ascending order.
+    y_src = np.searchsorted(-src_merc_edges, -out_merc, side="right") - 1
+    return y_src.astype(np.int32)
+
+
+# Strip count for the continuous-tone (RGB/RGBA) resampling path.  Within each
+# of these Mercator-equal strips, latitude is close enough to linear in Y that
+# a plain bilinear resample is visually exact.
+_MESH_STRIPS = 128
+
+# Band height (source rows) for the streamed palette gather.  Bounds the numpy
+# working set to output + one band instead of output + a full source copy.
+_STREAM_ROWS = 512
+
+# Palette images up to this many pixels take the one-shot MESH transform; the
+# huge continent files stay on the streamed gather to keep memory bounded.
+_TRANSFORM_MAX_PIXELS = 64_000_000
+
+
+def _reproject_mesh(img: Image.Image, out_h: int,
+                    lat_min: float, lat_max: float,
+                    merc_min: float, merc_max: float,
+                    resample: int) -> Image.Image:
+    """Remap the Y axis of an image with one MESH transform.
+
+    The Mercator remap is approximated piecewise-linearly: the output is cut
+    into quads of equal Mercator height, each mapped to its fractional
+    source band, and a single `Image.transform(..., Image.MESH, ...)` call
+    resamples them all inside Pillow's C kernels (AVX2 with pillow-simd).
+    No Python-level strip loop, no intermediate strip images, no pastes.
+    Continuous-tone images use BILINEAR (no row stepping at high latitudes);
+    palette images use NEAREST, which keeps mode "P" and its indices intact.
+    """
+    w, src_h = img.size
+
+    # Quad edges in output rows, and the fractional source rows they map to.
+    edges_out = np.linspace(0.0, float(out_h), _MESH_STRIPS + 1)
+    merc_e    = merc_max - edges_out / out_h * (merc_max - merc_min)
+    lat_e     = np.degrees(2.0 * np.arctan(np.exp(merc_e)) - math.pi / 2.0)
+    src_e     = np.clip((lat_max - lat_e) / (lat_max - lat_min) * src_h, 0.0, src_h)
+
+    mesh = []
+    for k in range(_MESH_STRIPS):
+        y0 = int(round(edges_out[k]))
+        y1 = int(round(edges_out[k + 1]))
+        if y1 <= y0:
+            continue
+        s0 = float(src_e[k])
+        s1 = float(src_e[k + 1])
+        # Source quad corners: top-left, bottom-left, bottom-right, top-right.
+        mesh.append(((0, y0, w, y1), (0.0, s0, 0.0, s1, float(w), s1, float(w), s0)))
+
+    return img.transform((w, out_h), Image.MESH, mesh, resample)
+
+
+def reproject(src_path: str, dst_path: str, lat_min: float, lat_max: float,
+              compress_level: int = 6) -> None:
     """
     Remap the Y axis of a plate-carree PNG to Web Mercator.
 
-    Algorithm (vectorised, nearest-neighbour):
+    Algorithm:
       For every output row y_out:
         1. Compute the Mercator Y value that row represents.
         2. Invert Mercator Y → geographic latitude.
         3. Map that latitude to a source row in the plate-carree image.
-        4. Copy that source row to the output.
+        4. Sample that source row into the output.
+      Palette images use exact nearest-neighbour row selection (indices must
+      not be interpolated); RGB / RGBA images use piecewise-linear bilinear
+      resampling, which avoids visible row stepping at high latitudes.
 
     Output dimensions:
       Width  – unchanged (longitude is linear in both projections).
@@ -169,43 +315,92 @@ def reproject(src_path: str, dst_path: str, lat_min: float, lat_max: float) -> N
 
     Image mode:
       Palette (P / 8-bit indexed) images are kept in palette mode to preserve
-      the Lorenz colour scale and keep file sizes small.  RGB / RGBA images
-      are handled identically.  The palette, including any transparency entry,
-      is copied to the output unchanged.
+      the Lorenz colour scale and keep file sizes small.  The palette,
+      including any transparency entry, is copied to the output unchanged.
     """
     img = Image.open(src_path)
     is_palette = (img.mode == "P")
     palette    = img.getpalette() if is_palette else None
     transparency = img.info.get("transparency")
 
-    arr   = np.array(img)   # shape (H, W) for P-mode, (H, W, C) for RGB
-    src_h = arr.shape[0]
+    src_h = img.height
     out_h = src_h
 
     merc_max = _merc_y(lat_max)
     merc_min = _merc_y(lat_min)
 
-    # Output row indices as fractions: 0 = top (lat_max), 1 = bottom (lat_min)
-    fraction = np.arange(out_h, dtype=np.float64) / (out_h - 1)
-
-    # Mercator Y for each output row → geographic latitude
-    merc_vals = merc_max - fraction * (merc_max - merc_min)
-    lats      = np.degrees(2.0 * np.arctan(np.exp(merc_vals)) - math.pi / 2.0)
-
-    # Source row index for each output row (nearest-neighbour, clamped)
-    y_src = np.clip(
-        np.round((lat_max - lats) / (lat_max - lat_min) * src_h).astype(np.int32),
-        0,
-        src_h - 1,
-    )
-
-    out_arr = arr[y_src]  # vectorised row selection — no Python loop needed
+    if is_palette and img.width * src_h > _TRANSFORM_MAX_PIXELS:
+        # Huge palette files: exact nearest-neighbour row selection on the
+        # index array, streamed in bands to keep memory bounded.
+        y_src = _compute_ysrc(out_h, src_h, lat_min, lat_max, merc_min, merc_max)
+
+        # De-duplicated gather: Mercator expansion repeats the same source row
+        # for many consecutive output rows (heavily so at high latitudes), and
+        # y_src is monotone, so identical indices form contiguous runs.  Each
+        # run is one distinct source row streamed to a block of output rows.
+        run_starts  = np.concatenate(([0], np.flatnonzero(np.diff(y_src)) + 1))
+        run_lengths = np.diff(np.concatenate((run_starts, [out_h])))
+        src_rows    = np.clip(y_src[run_starts], 0, src_h - 1)
+
+        # Stream the gather with a fixed memory budget: rather than staging a
+        # full HxW numpy copy of the decoded image (~120 MB for the continent
+        # files), crop bands of at most _STREAM_ROWS source rows and expand
+        # each band straight into the output buffer.  Peak numpy footprint is
+        # the output plus one band.  (PNG is not a windowable format, so PIL
+        # still decodes the file once internally — the saving is the staging
+        # copy, not the decode.)
+        # The output buffer is a disk-backed memmap rather than a fresh
+        # anonymous HxW allocation: its pages can be written back and evicted
+        # under memory pressure, so peak RSS is roughly PIL's decoded image
+        # alone instead of decoded image + full output — the continent files
+        # would otherwise brush against small CI memory limits.  The backing
+        # file is deleted automatically when the memmap is garbage-collected
+        # after the save.
+        w       = img.width
+        out_tmp = tempfile.TemporaryFile(dir=CACHE_DIR)
+        out_arr = np.memmap(out_tmp, dtype=np.uint8, mode="w+", shape=(out_h, w))
+        n_runs  = len(run_starts)
+
+        bands = []  # (first run, past-last run, first src row, past-last src row)
+        i = 0
+        while i < n_runs:
+            lo = int(src_rows[i])
+            j  = i
+            while j < n_runs and src_rows[j] < lo + _STREAM_ROWS:
+                j += 1
+            bands.append((i, j, lo, int(src_rows[j - 1]) + 1))
+            i = j
+
+        def _copy_band(band_spec):
+            i, j, lo, hi = band_spec
+            band = np.asarray(img.crop((0, lo, w, hi)))
+            o0   = int(run_starts[i])
+            o1   = int(run_starts[j]) if j < n_runs else out_h
+            out_arr[o0:o1] = np.repeat(band[src_rows[i:j] - lo],
+                                       run_lengths[i:j], axis=0)
+
+        # Bands write disjoint output slices, and both PIL's crop and NumPy's
+        # copy loops release the GIL, so the memcpy work spreads across cores
+        # up to the machine's memory bandwidth.
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as gather_pool:
+            list(gather_pool.map(_copy_band, bands))
+
+        # frombuffer maps the contiguous gather result directly ("P" is one of
+        # PIL's zero-copy raw modes); Image.fromarray would copy it once more.
+        out_img = Image.frombuffer("P", (w, out_h), out_arr, "raw", "P", 0, 1)
+    else:
+        # One-shot C path.  NEAREST keeps palette indices exact, so mode "P"
+        # survives the transform with no numpy round-trip at all.
+        resample = Image.NEAREST if is_palette else Image.BILINEAR
+        out_img  = _reproject_mesh(img, out_h, lat_min, lat_max,
+                                   merc_min, merc_max, resample)
 
-    out_img = Image.fromarray(out_arr, mode=img.mode)
     if is_palette and palette:
         out_img.putpalette(palette)
 
-    save_kwargs: dict = {}
+    # Deflate is single-threaded and dominates save time for the big PNGs;
+    # --fast drops to compress_level=1 while iterating on the pipeline.
+    save_kwargs: dict = {"compress_level": compress_level}
     if transparency is not None:
         save_kwargs["transparency"] = transparency
 
@@ -214,31 +409,66 @@ def reproject(src_path: str, dst_path: str, lat_min: float, lat_max: float) -> N
 
 # ── Entry point ───────────────────────────────────────────────────────────────
 
+def _submit_reproject(cpu_pool, entry: dict, compress_level: int):
+    cache_path  = os.path.join(CACHE_DIR,  entry["filename"])
+    output_path = os.path.join(OUTPUT_DIR, entry["filename"])
+    return cpu_pool.submit(
+        reproject, cache_path, output_path, entry["lat_min"], entry["lat_max"],
+        compress_level,
+    )
+
+
 def main() -> None:
     os.makedirs(CACHE_DIR,  exist_ok=True)
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    for entry in FILES:
-        filename = entry["filename"]
-        cache_path  = os.path.join(CACHE_DIR,  filename)
-        output_path = os.path.join(OUTPUT_DIR, filename)
-
-        # ── Step 1: download to cache (skip if already present) ──
-        if os.path.exists(cache_path):
+    compress_level = 1 if "--fast" in sys.argv[1:] else 6
+    refresh        = "--refresh" in sys.argv[1:]
+
+    # Overlap network with compute: downloads run in a thread pool (IO-bound,
+    # the GIL is released while blocked on sockets), reprojections in a
+    # process pool (CPU/memory-bound NumPy+PIL work).  Each file is handed to
+    # the process pool as soon as its download finishes; already-cached files
+    # start reprojecting immediately.
+    with ThreadPoolExecutor(max_workers=4) as net_pool, \
+         ProcessPoolExecutor(max_workers=os.cpu_count()) as cpu_pool:
+
+        downloads     = {}  # future → entry
+        reprojections = {}  # future → entry
+
+        for entry in FILES:
+            cache_path = os.path.join(CACHE_DIR, entry["filename"])
+            if os.path.exists(cache_path) and not refresh:
+                size_mb = os.path.getsize(cache_path) / 1_048_576
+                print(f"  Cache hit ({size_mb:.1f} MB): {entry['filename']}")
+                reprojections[_submit_reproject(cpu_pool, entry, compress_level)] = entry
+            else:
+                # With --refresh, cached files are revalidated by conditional
+                # GET — a 304 keeps the local copy without transferring it.
+                verb = "Revalidating" if os.path.exists(cache_path) else "Downloading"
+                print(f"  {verb} {entry['description']} …")
+                fut = net_pool.submit(_download, entry["url"], cache_path, quiet=True)
+                downloads[fut] = entry
+
+        for fut in as_completed(downloads):
+            entry = downloads[fut]
+            fetched = fut.result()  # re-raise download errors here
+            cache_path = os.path.join(CACHE_DIR, entry["filename"])
             size_mb = os.path.getsize(cache_path) / 1_048_576
-            print(f"  Cache hit ({size_mb:.1f} MB): {filename}")
-        else:
-            print(f"  Downloading {entry['description']} …")
-            _download(entry["url"], cache_path)
-            size_mb = os.path.getsize(cache_path) / 1_048_576
-            print(f"  Cached  ({size_mb:.1f} MB): {cache_path}")
-
-        # ── Step 2: reproject plate-carree → Web Mercator ──
-        print(f"  Reprojecting {filename} (lat {entry['lat_min']}° – {entry['lat_max']}°) …", end=" ")
-        reproject(cache_path, output_path, entry["lat_min"], entry["lat_max"])
-        size_mb = os.path.getsize(output_path) / 1_048_576
-        print(f"done  ({size_mb:.1f} MB -> {output_path})")
-        print()
+            if fetched:
+                print(f"  Cached  ({size_mb:.1f} MB): {cache_path}")
+            else:
+                print(f"  Not modified ({size_mb:.1f} MB): {entry['filename']}")
+            reprojections[_submit_reproject(cpu_pool, entry, compress_level)] = entry
+
+        for fut in as_completed(reprojections):
+            entry = reprojections[fut]
+            fut.result()  # re-raise reprojection errors here
+            output_path = os.path.join(OUTPUT_DIR, entry["filename"])
+            size_mb = os.path.getsize(output_path) / 1_048_576
+            print(f"  Reprojected {entry['filename']} "
+                  f"(lat {entry['lat_min']}° – {entry['lat_max']}°)  "
+                  f"({size_mb:.1f} MB -> {output_path})")
 
     total_mb = sum(
         os.path.getsize(os.path.join(OUTPUT_DIR, e["filename"])) / 1_048_576
@@ -7,28 +7,42 @@ Raster sources (Natural Earth, downloaded & cached on first run):
   50m  HYP_50M_SR_W  (~97 MB zip)   → europe_overview
   10m  HYP_LR_SR_W   (~223 MB zip)  → central_europe_detail
 
-Output:
-  scripts/output/europe_overview.png        – lon -25..45, lat 34..72
-  scripts/output/central_europe_detail.png  – lon 8..32,  lat 44..58
+Output (per map: photographic base as JPEG + flat-colour overlay as indexed
+PNG with transparency; Leaflet stacks the two ImageOverlays at identical
+bounds):
+  scripts/output/europe_overview_base.jpg        – lon -25..45, lat 34..72
+  scripts/output/europe_overview_overlay.png
+  scripts/output/central_europe_detail_base.jpg  – lon 8..32,  lat 44..58
+  scripts/output/central_europe_detail_overlay.png
 
 Usage:
-  pip install cartopy matplotlib pillow numpy
+  pip install cartopy pillow numpy  # cartopy only fetches/reads NE shapefiles
+  pip install tifffile zarr         # optional, enables windowed TIFF reads
   python scripts/generate_maps.py
 """
 
+import email.utils
+import functools
+import io
 import os
+import shutil
 import sys
+import urllib.error
 import urllib.request
 import zipfile
 
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import numpy as np
-import cartopy.crs as ccrs
-import cartopy.feature as cfeature
-from cartopy.feature import NaturalEarthFeature
-from PIL import Image, ImageEnhance
+import cartopy.io.shapereader as shpreader
+from PIL import Image, ImageDraw
+
+# tifffile + zarr are optional: together they expose the TIFF as a chunked
+# array so only the strips/tiles intersecting the crop window are decoded,
+# instead of the full world raster.
+try:
+    import tifffile
+    import zarr
+except ImportError:
+    tifffile = None
 
 # ── Directories ───────────────────────────────────────────────────────────────
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -63,34 +77,89 @@ COL_LAKE   = "#1a3a5c"
 
 # ── Download / cache ──────────────────────────────────────────────────────────
 
-def _download_file(url: str, dest_path: str):
-    """Download url -> dest_path with browser headers and a progress bar."""
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent":      "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept":          "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-            "Referer":         "https://www.naturalearthdata.com/",
-        },
-    )
-    with urllib.request.urlopen(req) as resp:
-        total = int(resp.headers.get("Content-Length", 0))
-        downloaded = 0
-        block = 1 << 16
+class _ProgressReader(io.RawIOBase):
+    """File-like wrapper that counts bytes read and draws a progress bar.
+
+    Wrapping the HTTP response lets shutil.copyfileobj run the actual copy
+    loop in C with 1 MiB blocks, while the bar is redrawn at most ~50 times
+    per download instead of once per 64 KiB chunk.
+    """
+
+    def __init__(self, raw, total: int):
+        self._raw        = raw
+        self._total      = total
+        self._downloaded = 0
+        self._reported   = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = self._raw.readinto(b)
+        self._downloaded += n
+        if self._total and self._downloaded - self._reported > self._total / 50:
+            self._report()
+        return n
+
+    def _report(self) -> None:
+        self._reported = self._downloaded
+        pct = self._downloaded * 100 / self._total
+        bar = "#" * int(pct / 2)
+        sys.stdout.write(f"\r    [{bar:<50}] {pct:5.1f}%  {self._downloaded/1e6:6.1f}/{self._total/1e6:.1f} MB")
+        sys.stdout.flush()
+
+    def finish(self) -> None:
+        if self._total:
+            self._report()
+        print()
+
+
+def _download_file(url: str, dest_path: str) -> bool:
+    """Download url -> dest_path with browser headers and a progress bar.
+
+    An existing dest_path (e.g. a zip left by an interrupted run) is offered
+    to the server via If-Modified-Since / If-None-Match; a 304 answer keeps
+    the local copy and skips the transfer.  Returns True when a new copy was
+    written, False on 304.
+    """
+    headers = {
+        "User-Agent":      "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept":          "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Referer":         "https://www.naturalearthdata.com/",
+    }
+    etag_path = dest_path + ".etag"
+    if os.path.exists(dest_path):
+        headers["If-Modified-Since"] = email.utils.formatdate(
+            os.path.getmtime(dest_path), usegmt=True
+        )
+        if os.path.exists(etag_path):
+            with open(etag_path) as f:
+                headers["If-None-Match"] = f.read().strip()
+
+    req = urllib.request.Request(url, headers=headers)
+    try:
+        resp = urllib.request.urlopen(req)
+    except urllib.error.HTTPError as err:
+        if err.code == 304:
+            print("    Not modified — keeping cached copy")
+            return False
+        raise
+
+    with resp:
+        total  = int(resp.headers.get("Content-Length", 0))
+        etag   = resp.headers.get("ETag")
+        reader = _ProgressReader(resp, total)
         with open(dest_path, "wb") as f:
-            while True:
-                chunk = resp.read(block)
-                if not chunk:
-                    break
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total:
-                    pct = downloaded * 100 / total
-                    bar = "#" * int(pct / 2)
-                    sys.stdout.write(f"\r    [{bar:<50}] {pct:5.1f}%  {downloaded/1e6:6.1f}/{total/1e6:.1f} MB")
-                    sys.stdout.flush()
-    print()
+            shutil.copyfileobj(reader, f, length=1 << 20)
+    reader.finish()
+
+    if etag:
+        with open(etag_path, "w") as f:
+            f.write(etag)
+    elif os.path.exists(etag_path):
+        os.remove(etag_path)
+    return True
 
 
 def get_raster_path(resolution: str) -> str:
@@ -112,6 +181,8 @@ def get_raster_path(resolution: str) -> str:
     with zipfile.ZipFile(zip_path, "r") as z:
         z.extractall(CACHE_DIR)
     os.remove(zip_path)
+    if os.path.exists(zip_path + ".etag"):
+        os.remove(zip_path + ".etag")
 
     for root, _, files in os.walk(CACHE_DIR):
         for fname in files:
@@ -129,6 +200,63 @@ def get_raster_path(resolution: str) -> str:
 
 # ── Raster processing ─────────────────────────────────────────────────────────
 
+def _window_px(lon_min: float, lon_max: float,
+               lat_min: float, lat_max: float,
+               w: int, h: int):
+    """Pixel box (px0, py0, px1, py1) of a lon/lat window in a world raster.
+
+    Rounds to the nearest pixel edge — int() truncation biased every edge up
+    to one pixel west/north, which is a few km on the 21600-px 10m raster.
+    """
+    px0 = int(round((lon_min + 180) / 360 * w))
+    px1 = int(round((lon_max + 180) / 360 * w))
+    py0 = int(round((90 - lat_max) / 180 * h))
+    py1 = int(round((90 - lat_min) / 180 * h))
+    return px0, py0, px1, py1
+
+
+@functools.lru_cache(maxsize=2)
+def _open_zarr(tif_path: str):
+    """Open a TIFF as a zarr array once per path and keep the handle alive —
+    both generators may window the same raster."""
+    return zarr.open(tifffile.imread(tif_path, aszarr=True), mode="r")
+
+
+@functools.lru_cache(maxsize=2)
+def _open_raster_array(tif_path: str) -> np.ndarray:
+    """Decode a raster once per path into a NumPy array.  A second decode of
+    the ~1 GB uncompressed 10m raster would dwarf everything else; window
+    crops of the cached array are O(1) stride views, not copies."""
+    img = Image.open(tif_path)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGB")
+    return np.asarray(img)
+
+
+def _read_window(tif_path: str,
+                 lon_min: float, lon_max: float,
+                 lat_min: float, lat_max: float) -> np.ndarray:
+    """Read the lon/lat window of the raster as a float32 RGB array.
+
+    With tifffile + zarr installed the TIFF is sliced through the zarr
+    interface, which decodes only the strips intersecting the window — for
+    the central-Europe crop that is ~6 % of the world raster.  The PIL
+    fallback still decodes the whole image (once, memoized); the window is
+    then a pure stride view of the cached array, so the only copy made is
+    the float32 promotion of the window itself.
+    """
+    if tifffile is not None:
+        za = _open_zarr(tif_path)
+        h, w = za.shape[:2]
+        px0, py0, px1, py1 = _window_px(lon_min, lon_max, lat_min, lat_max, w, h)
+        return np.asarray(za[py0:py1, px0:px1, :3], dtype=np.float32)
+
+    arr = _open_raster_array(tif_path)
+    h, w = arr.shape[:2]
+    px0, py0, px1, py1 = _window_px(lon_min, lon_max, lat_min, lat_max, w, h)
+    return arr[py0:py1, px0:px1, :3].astype(np.float32)
+
+
 def crop_and_darken(
     tif_path: str,
     lon_min: float, lon_max: float,
@@ -136,96 +264,150 @@ def crop_and_darken(
     brightness: float = 0.65,
     saturation: float = 0.70,
 ) -> np.ndarray:
-    img = Image.open(tif_path).convert("RGB")
-    w, h = img.size
-    px0 = int((lon_min + 180) / 360 * w)
-    px1 = int((lon_max + 180) / 360 * w)
-    py0 = int((90 - lat_max) / 180 * h)
-    py1 = int((90 - lat_min) / 180 * h)
-    cropped = img.crop((px0, py0, px1, py1))
-    cropped = ImageEnhance.Brightness(cropped).enhance(brightness)
-    cropped = ImageEnhance.Color(cropped).enhance(saturation)
-    return np.array(cropped)
-
-
-# ── Matplotlib / Cartopy helpers ──────────────────────────────────────────────
-
-def make_figure(width_px: int, height_px: int, dpi: int = 300):
-    return plt.figure(
-        figsize=(width_px / dpi, height_px / dpi),
-        dpi=dpi,
-        facecolor="#0d1b2a",
-    )
-
-
-def add_ax(fig, lon_min, lon_max, lat_min, lat_max):
-    ax = fig.add_axes([0, 0, 1, 1], projection=ccrs.PlateCarree())
-    ax.set_extent([lon_min, lon_max, lat_min, lat_max], crs=ccrs.PlateCarree())
-    ax.set_facecolor("#0d1b2a")
-    ax.spines["geo"].set_visible(False)
-    return ax
-
-
-def add_vector_overlays(ax, resolution: str = "10m", include_rivers: bool = False):
-    lakes = NaturalEarthFeature(
-        "physical", "lakes", resolution,
-        facecolor=COL_LAKE, edgecolor=COL_COAST, linewidth=0.3,
-    )
-    ax.add_feature(lakes, zorder=5)
-    ax.add_feature(
-        cfeature.COASTLINE.with_scale(resolution),
-        edgecolor=COL_COAST, linewidth=0.6, zorder=6,
-    )
-    borders = NaturalEarthFeature(
-        "cultural", "admin_0_boundary_lines_land", resolution,
-        facecolor="none", edgecolor=COL_BORDER, linewidth=0.5,
-    )
-    ax.add_feature(borders, zorder=7)
+    """Crop the raster to the lon/lat window and darken/desaturate it.
+
+    Brightness and saturation are fused into one vectorised NumPy pass:
+    both enhancers are linear, so
+        out = brightness * (saturation * rgb + (1 - saturation) * luma)
+    reproduces ImageEnhance.Brightness followed by ImageEnhance.Color in a
+    single read and a single write of the cropped window, instead of the
+    five full image traversals of the old PIL enhancer chain.
+    """
+    arr = _read_window(tif_path, lon_min, lon_max, lat_min, lat_max)
+
+    # ITU-R 601-2 luma — the same weights ImageEnhance.Color applies via "L".
+    luma = arr @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    out  = brightness * (saturation * arr + (1.0 - saturation) * luma[..., None])
+    return np.clip(out, 0.0, 255.0).astype(np.uint8)
+
+
+# ── Vector overlays (PIL) ─────────────────────────────────────────────────────
+
+def _iter_rings(geom):
+    """Yield the coordinate sequences of a geometry's rings / lines."""
+    t = geom.geom_type
+    if t in ("LineString", "LinearRing"):
+        yield geom.coords
+    elif t == "Polygon":
+        yield geom.exterior.coords
+        for ring in geom.interiors:
+            yield ring.coords
+    else:  # Multi* / GeometryCollection
+        for part in geom.geoms:
+            yield from _iter_rings(part)
+
+
+def draw_vector_overlays(layer: Image.Image,
+                         lon_min, lon_max, lat_min, lat_max,
+                         dpi: int,
+                         resolution: str = "10m",
+                         include_rivers: bool = False) -> None:
+    """Draw lakes, coastline and borders (optionally rivers) onto the layer.
+
+    The output is plain plate carree, so projecting a geometry is two linear
+    rescales — no need for cartopy's transform stack or a matplotlib canvas
+    the size of the full 60 Mpx figure.  cartopy is still used to download
+    and read the Natural Earth shapefiles.  Stroke widths reproduce the old
+    matplotlib linewidths (in points) at the given dpi.
+    """
+    w, h = layer.size
+    draw = ImageDraw.Draw(layer)
+
+    def width(pt: float) -> int:
+        return max(1, round(pt * dpi / 72))
+
+    def to_px(coords):
+        c  = np.asarray(coords)
+        px = (c[:, 0] - lon_min) / (lon_max - lon_min) * w
+        py = (lat_max - c[:, 1]) / (lat_max - lat_min) * h
+        return list(zip(px.tolist(), py.tolist()))
+
+    def geometries(category: str, name: str):
+        path = shpreader.natural_earth(resolution=resolution,
+                                       category=category, name=name)
+        for geom in shpreader.Reader(path).geometries():
+            gx0, gy0, gx1, gy1 = geom.bounds
+            if gx1 < lon_min or gx0 > lon_max or gy1 < lat_min or gy0 > lat_max:
+                continue  # entirely off-canvas
+            yield geom
+
+    # Draw order mirrors the old zorders: lakes, coastline, borders, rivers.
+    for geom in geometries("physical", "lakes"):
+        polys = geom.geoms if geom.geom_type == "MultiPolygon" else (geom,)
+        for poly in polys:
+            # Fill the exterior only, then punch island holes back out —
+            # ImageDraw replaces pixels on the RGBA layer, so a zero-alpha
+            # fill restores transparency the way matplotlib honoured holes.
+            draw.polygon(to_px(poly.exterior.coords), fill=COL_LAKE)
+            for ring in poly.interiors:
+                draw.polygon(to_px(ring.coords), fill=(0, 0, 0, 0))
+        for coords in _iter_rings(geom):
+            draw.line(to_px(coords), fill=COL_COAST, width=width(0.3), joint="curve")
+    for geom in geometries("physical", "coastline"):
+        for coords in _iter_rings(geom):
+            draw.line(to_px(coords), fill=COL_COAST, width=width(0.6), joint="curve")
+    for geom in geometries("cultural", "admin_0_boundary_lines_land"):
+        for coords in _iter_rings(geom):
+            draw.line(to_px(coords), fill=COL_BORDER, width=width(0.5), joint="curve")
     if include_rivers:
-        rivers = NaturalEarthFeature(
-            "physical", "rivers_lake_centerlines", resolution,
-            facecolor="none", edgecolor=COL_RIVER, linewidth=0.45,
-        )
-        ax.add_feature(rivers, zorder=8)
-
-
-def save_figure(fig, out_path: str, dpi: int):
-    fig.savefig(out_path, dpi=dpi, bbox_inches="tight", pad_inches=0, facecolor="#0d1b2a")
-    plt.close(fig)
-    size_mb = os.path.getsize(out_path) / 1_048_576
-    print(f"  OK  Saved: {out_path}  ({size_mb:.1f} MB)")
+        for geom in geometries("physical", "rivers_lake_centerlines"):
+            for coords in _iter_rings(geom):
+                draw.line(to_px(coords), fill=COL_RIVER, width=width(0.45), joint="curve")
+
+
+def save_layers(base: Image.Image, overlay: Image.Image, stem: str):
+    """Save the base layer as JPEG and the overlay as an indexed PNG.
+
+    Splitting the layers lets each use the encoder that suits it: the
+    photographic hypso base compresses 5–10x smaller through libjpeg's SIMD
+    path than through PNG deflate, and the flat-colour overlay quantizes to
+    a tiny 16-colour palette PNG that keeps its transparency.  Leaflet
+    stacks the two ImageOverlays at identical bounds.
+    """
+    base_path    = os.path.join(OUTPUT_DIR, stem + "_base.jpg")
+    overlay_path = os.path.join(OUTPUT_DIR, stem + "_overlay.png")
+    base.save(base_path, quality=85, progressive=True, optimize=True)
+    overlay.quantize(16, method=Image.FASTOCTREE, kmeans=0).save(
+        overlay_path, optimize=True
+    )
+    for path in (base_path, overlay_path):
+        size_mb = os.path.getsize(path) / 1_048_576
+        print(f"  OK  Saved: {path}  ({size_mb:.1f} MB)")
 
 
 # ── Map generators ────────────────────────────────────────────────────────────
 
 def generate_europe_overview():
-    print("\nGenerating europe_overview.png ...")
+    print("\nGenerating europe_overview layers ...")
     LON_MIN, LON_MAX = -25, 45
     LAT_MIN, LAT_MAX =  34, 72
-    W_PX, H_PX, DPI  = 10000, 6000, 300
     tif_path  = get_raster_path("50m")
     img_array = crop_and_darken(tif_path, LON_MIN, LON_MAX, LAT_MIN, LAT_MAX, brightness=0.65, saturation=0.70)
-    fig = make_figure(W_PX, H_PX, DPI)
-    ax  = add_ax(fig, LON_MIN, LON_MAX, LAT_MIN, LAT_MAX)
-    ax.imshow(img_array, origin="upper", extent=[LON_MIN, LON_MAX, LAT_MIN, LAT_MAX],
-              transform=ccrs.PlateCarree(), zorder=1, interpolation="lanczos")
-    add_vector_overlays(ax, resolution="10m", include_rivers=False)
-    save_figure(fig, os.path.join(OUTPUT_DIR, "europe_overview.png"), DPI)
+    # Output at the raster's native crop resolution — upscaling (the old
+    # 10000x6000 target was a 2.4x Lanczos blow-up of the 50m crop) only
+    # softens the imagery and multiplies encode time; Leaflet scales anyway.
+    h_px, w_px = img_array.shape[:2]
+    dpi       = max(72, round(300 * w_px / 10000))  # keep overlay stroke weight
+    base      = Image.fromarray(img_array)
+    overlay   = Image.new("RGBA", base.size, (0, 0, 0, 0))
+    draw_vector_overlays(overlay, LON_MIN, LON_MAX, LAT_MIN, LAT_MAX, dpi,
+                         resolution="10m", include_rivers=False)
+    save_layers(base, overlay, "europe_overview")
 
 
 def generate_central_europe_detail():
-    print("\nGenerating central_europe_detail.png ...")
+    print("\nGenerating central_europe_detail layers ...")
     LON_MIN, LON_MAX =  8, 32
     LAT_MIN, LAT_MAX = 44, 58
-    W_PX, H_PX, DPI  = 8000, 5000, 300
     tif_path  = get_raster_path("10m")
     img_array = crop_and_darken(tif_path, LON_MIN, LON_MAX, LAT_MIN, LAT_MAX, brightness=0.65, saturation=0.70)
-    fig = make_figure(W_PX, H_PX, DPI)
-    ax  = add_ax(fig, LON_MIN, LON_MAX, LAT_MIN, LAT_MAX)
-    ax.imshow(img_array, origin="upper", extent=[LON_MIN, LON_MAX, LAT_MIN, LAT_MAX],
-              transform=ccrs.PlateCarree(), zorder=1, interpolation="lanczos")
-    add_vector_overlays(ax, resolution="10m", include_rivers=True)
-    save_figure(fig, os.path.join(OUTPUT_DIR, "central_europe_detail.png"), DPI)
+    h_px, w_px = img_array.shape[:2]
+    dpi       = max(72, round(300 * w_px / 8000))   # keep overlay stroke weight
+    base      = Image.fromarray(img_array)
+    overlay   = Image.new("RGBA", base.size, (0, 0, 0, 0))
+    draw_vector_overlays(overlay, LON_MIN, LON_MAX, LAT_MIN, LAT_MAX, dpi,
+                         resolution="10m", include_rivers=True)
+    save_layers(base, overlay, "central_europe_detail")
 
 
 # ── Entry point ───────────────────────────────────────────────────────────────